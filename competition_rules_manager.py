@@ -7,7 +7,8 @@ Yeni Recall yarışması kurallarını yönetir ve günlük minimum işlem kontr
 import os
 import json
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 from perso_1903_client import get_competition_rules, get_competition_status, get_trade_history
@@ -26,6 +27,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ET saat dilimi (yaz/kış saati geçişleriyle birlikte), modül yüklenirken bir kez çözülür
+try:
+    ET_TZ = ZoneInfo("America/New_York")
+except ZoneInfoNotFoundError:
+    # tzdata yoksa eski sabit UTC-4 davranışına dön
+    ET_TZ = timezone(timedelta(hours=-4))
+
+# Yarışma günü 9 AM ET'de başlar
+DAY_START_HOUR_ET = 9
+
+def competition_day_key(moment: datetime) -> str:
+    """Verilen anın ait olduğu yarışma gününün anahtarını döndür (9 AM ET - 9 AM ET)"""
+    # Saat dilimi yoksa UTC kabul et
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    moment_et = moment.astimezone(ET_TZ)
+    
+    if moment_et.hour < DAY_START_HOUR_ET:
+        # Henüz yeni gün başlamamış, önceki gün
+        day_date = (moment_et - timedelta(days=1)).date()
+    else:
+        # Yeni gün başlamış
+        day_date = moment_et.date()
+    
+    return day_date.strftime("%Y-%m-%d")
+
 class CompetitionRulesManager:
     """Yarışma kuralları yöneticisi"""
     
@@ -97,44 +124,49 @@ class CompetitionRulesManager:
             if os.path.exists(self.daily_trades_file):
                 with open(self.daily_trades_file, 'r', encoding='utf-8') as f:
                     self.daily_trades = json.load(f)
-                logger.info(f"✅ Günlük işlemler yüklendi: {len(self.daily_trades)} gün")
+                logger.info(f"✅ Günlük işlemler yüklendi ({self.daily_trades_file}): {len(self.daily_trades)} gün")
             else:
                 self.daily_trades = {}
                 logger.info("📝 Yeni günlük işlem dosyası oluşturuldu")
         except Exception as e:
             logger.error(f"❌ Günlük işlemler yüklenirken hata: {e}")
             self.daily_trades = {}
+            
+            # Son çare: ana dosya bozuksa artakalan geçici dosyayı dene.
+            # Bu dosya yarıda kalmış bir yazımdan kalmış olabilir; okunamazsa boş başlanır.
+            tmp_file = f"{self.daily_trades_file}.tmp"
+            try:
+                if os.path.exists(tmp_file):
+                    with open(tmp_file, 'r', encoding='utf-8') as f:
+                        self.daily_trades = json.load(f)
+                    logger.warning(f"⚠️ Günlük işlemler geçici dosyadan kurtarıldı ({tmp_file}): {len(self.daily_trades)} gün")
+            except Exception as tmp_error:
+                logger.error(f"❌ Geçici dosyadan kurtarma başarısız: {tmp_error}")
+                self.daily_trades = {}
     
     def save_daily_trades(self) -> None:
         """Günlük işlemleri kaydet"""
         try:
-            with open(self.daily_trades_file, 'w', encoding='utf-8') as f:
+            # Önce geçici dosyaya yaz, sonra atomik olarak yer değiştir
+            tmp_file = f"{self.daily_trades_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
                 json.dump(self.daily_trades, f, indent=2, ensure_ascii=False)
+                # Yer değiştirmeden önce içeriğin diske ulaştığından emin ol
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.daily_trades_file)
         except Exception as e:
             logger.error(f"❌ Günlük işlemler kaydedilirken hata: {e}")
     
     def get_current_day_key(self) -> str:
         """Mevcut günün anahtarını döndür (ET saatine göre)"""
-        # ET saatini hesapla (UTC-4 veya UTC-5)
-        now_utc = datetime.utcnow()
-        # Basit ET hesaplama (yaz saati için UTC-4)
-        et_offset = timedelta(hours=4)
-        now_et = now_utc - et_offset
-        
-        # Günlük periyod: 9 AM ET'den 9 AM ET'ye kadar
-        day_start_hour = 9
-        if now_et.hour < day_start_hour:
-            # Henüz yeni gün başlamamış, önceki gün
-            day_date = (now_et - timedelta(days=1)).date()
-        else:
-            # Yeni gün başlamış
-            day_date = now_et.date()
-        
-        return day_date.strftime("%Y-%m-%d")
+        return competition_day_key(datetime.now(ET_TZ))
     
-    def record_trade(self, trade_data: Dict[str, Any]) -> None:
+    def record_trade(self, trade_data: Dict[str, Any], day_key: Optional[str] = None,
+                     save: bool = True) -> None:
         """İşlemi kaydet"""
-        day_key = self.get_current_day_key()
+        if day_key is None:
+            day_key = self.get_current_day_key()
         
         if day_key not in self.daily_trades:
             self.daily_trades[day_key] = {
@@ -151,7 +183,8 @@ class CompetitionRulesManager:
         self.daily_trades[day_key]["last_trade_time"] = datetime.now().isoformat()
         
         # Dosyaya kaydet
-        self.save_daily_trades()
+        if save:
+            self.save_daily_trades()
         
         logger.info(f"[TRADE] İşlem kaydedildi: {day_key} - Toplam: {self.daily_trades[day_key]['trade_count']}")
     
@@ -257,18 +290,7 @@ class CompetitionRulesManager:
                     try:
                         # Timestamp'i parse et ve gün anahtarını bul
                         trade_datetime = datetime.fromisoformat(trade_time.replace("Z", "+00:00"))
-                        # ET'ye çevir
-                        et_offset = timedelta(hours=4)
-                        trade_et = trade_datetime - et_offset
-                        
-                        # Günlük periyod kontrolü
-                        day_start_hour = 9
-                        if trade_et.hour < day_start_hour:
-                            day_date = (trade_et - timedelta(days=1)).date()
-                        else:
-                            day_date = trade_et.date()
-                        
-                        day_key = day_date.strftime("%Y-%m-%d")
+                        day_key = competition_day_key(trade_datetime)
                         
                         # İşlemi kaydet
                         self.record_trade({
@@ -277,12 +299,15 @@ class CompetitionRulesManager:
                             "token_symbol": trade.get("symbol", "UNKNOWN"),
                             "trade_type": trade.get("type", "unknown"),
                             "source": "api_sync"
-                        })
+                        }, day_key, save=False)
                         
                     except Exception as e:
                         logger.warning(f"⚠️ İşlem parse edilemedi: {e}")
                         continue
             
+            # Tüm işlemler eklendikten sonra tek seferde kaydet
+            self.save_daily_trades()
+            
             logger.info("[SYNC] Günlük işlemler API ile senkronize edildi")
             
         except Exception as e:
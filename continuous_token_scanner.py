@@ -6,6 +6,8 @@ DexScreener ve CoinGecko API'lerini kullanarak sürekli token çekip bug inflati
 
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import time
 from typing import Dict, Any, List, Optional
@@ -41,6 +43,24 @@ if not RECALL_API_KEY:
 DEXSCREENER_API = "https://api.dexscreener.com/latest"
 COINGECKO_API = "https://api.coingecko.com/api/v3"
 
+# Shared HTTP session: keep-alive + connection pool, retries on transient errors
+_HTTP = requests.Session()
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 502, 503, 504),
+        raise_on_status=False
+    )
+)
+_HTTP.mount("https://", _HTTP_ADAPTER)
+_HTTP.mount("http://", _HTTP_ADAPTER)
+
+# CoinGecko coin id -> kontrat adresi (başarılı sorgular oturum boyunca saklanır)
+_COINGECKO_ADDRESS_CACHE: Dict[str, Optional[str]] = {}
+
 # Global variables for tracking
 SCAN_COUNT = 0
 TOTAL_TOKENS_FOUND = 0
@@ -48,14 +68,14 @@ TOTAL_ANALYZED = 0
 ANOMALIES_FOUND = 0
 SCANNED_TOKENS = set()  # Taranan tokenleri takip etmek için
 
-def _headers():
-    """Generate headers for Recall API requests"""
-    return {
-        "Authorization": f"Bearer {RECALL_API_KEY}",
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "User-Agent": "Perso-1903/continuous-scanner"
-    }
+# Headers for Recall API requests - built once. Not set on the shared session,
+# which also talks to DexScreener/CoinGecko and must not leak the bearer token.
+_RECALL_HEADERS = {
+    "Authorization": f"Bearer {RECALL_API_KEY}",
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+    "User-Agent": "Perso-1903/continuous-scanner"
+}
 
 def get_trending_tokens_dexscreener(limit: int = 50) -> List[Dict[str, Any]]:
     """DexScreener'dan trending tokenleri çek"""
@@ -63,7 +83,7 @@ def get_trending_tokens_dexscreener(limit: int = 50) -> List[Dict[str, Any]]:
         print(f"🔍 DexScreener'dan {limit} trending token çekiliyor...")
         
         # DexScreener'ın doğru endpoint'i
-        response = requests.get(f"{DEXSCREENER_API}/dex/search/?q=ethereum", timeout=15)
+        response = _HTTP.get(f"{DEXSCREENER_API}/dex/search/?q=ethereum", timeout=15)
         
         if response.status_code != 200:
             print(f"❌ DexScreener API Error: {response.status_code}")
@@ -89,7 +109,7 @@ def get_trending_tokens_coingecko(limit: int = 50) -> List[Dict[str, Any]]:
         print(f"🔍 CoinGecko'dan {limit} trending token çekiliyor...")
         
         # CoinGecko trending endpoint'i
-        response = requests.get(f"{COINGECKO_API}/search/trending", timeout=15)
+        response = _HTTP.get(f"{COINGECKO_API}/search/trending", timeout=15)
         
         if response.status_code != 200:
             print(f"❌ CoinGecko API Error: {response.status_code}")
@@ -200,22 +220,30 @@ def get_token_address_from_coingecko(token: Dict[str, Any]) -> Optional[str]:
         coin_id = token.get('id', '')
         if not coin_id:
             return None
+        
+        # Kontrat adresleri değişmez - daha önce çözüldüyse tekrar sorgulama
+        if coin_id in _COINGECKO_ADDRESS_CACHE:
+            return _COINGECKO_ADDRESS_CACHE[coin_id]
             
         # CoinGecko'dan token detaylarını çek
-        response = requests.get(f"{COINGECKO_API}/coins/{coin_id}", timeout=15)
+        response = _HTTP.get(f"{COINGECKO_API}/coins/{coin_id}", timeout=15)
         if response.status_code == 200:
             data = response.json()
             platforms = data.get('platforms', {})
+            address = None
             
             # Ethereum adresini öncelikle ara
             if 'ethereum' in platforms:
-                return platforms['ethereum']
+                address = platforms['ethereum']
             # Solana adresini ara
             elif 'solana' in platforms:
-                return platforms['solana']
+                address = platforms['solana']
             # Diğer platformları ara
             elif platforms:
-                return list(platforms.values())[0]
+                address = list(platforms.values())[0]
+            
+            _COINGECKO_ADDRESS_CACHE[coin_id] = address
+            return address
         
         return None
         
@@ -243,10 +271,10 @@ def check_token_in_recall_api(address: str) -> Dict[str, Any]:
             "specificChain": specific_chain
         }
         
-        response = requests.get(
+        response = _HTTP.get(
             f"{RECALL_API_BASE}/api/price", 
             params=params,
-            headers=_headers(), 
+            headers=_RECALL_HEADERS, 
             timeout=15
         )
         
@@ -264,11 +292,13 @@ def check_token_in_recall_api(address: str) -> Dict[str, Any]:
     except Exception as e:
         return {"found": False, "error": str(e)}
 
-def run_bug_inflation_analysis(address: str, amount: float = 10000) -> Dict[str, Any]:
+def run_bug_inflation_analysis(address: str, amount: float = 10000,
+                               recall_check: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Token için bug inflation analizi yap"""
     try:
-        # Token bilgilerini al
-        recall_check = check_token_in_recall_api(address)
+        # Token bilgilerini al (çağıran zaten kontrol ettiyse tekrar sorgulama)
+        if recall_check is None:
+            recall_check = check_token_in_recall_api(address)
         if not recall_check["found"]:
             return {
                 "address": address,
@@ -365,7 +395,7 @@ def scan_dynamic_tokens(source: str = "dexscreener",
             print(f"   ✅ Token {i} bulundu: {recall_check['data'].get('symbol', 'UNKNOWN')}")
             
             # Bug inflation analizi yap
-            analysis = run_bug_inflation_analysis(address)
+            analysis = run_bug_inflation_analysis(address, recall_check=recall_check)
             if analysis["success"]:
                 results.append(analysis)
                 TOTAL_ANALYZED += 1
@@ -413,6 +443,9 @@ def continuous_scan():
     print("🛑 Durdurmak için Ctrl+C tuşlarına basın")
     print("=" * 60)
     
+    scan_interval = 3
+    next_run = time.monotonic()
+    
     try:
         while True:
             # DexScreener'dan tokenleri çek ve analiz et
@@ -426,12 +459,19 @@ def continuous_scan():
             # Sonuçları yazdır
             print_continuous_results(results)
             
-            # 3 saniye bekle
-            print(f"\n⏰ Sonraki tarama için 3 saniye bekleniyor...")
-            print(f"🕐 Sonraki tarama: {(datetime.now() + timedelta(seconds=3)).strftime('%H:%M:%S')}")
+            # Sonraki taramayı mutlak zamana göre planla (tarama süresi kaymaya yol açmasın)
+            next_run += scan_interval
+            now = time.monotonic()
+            if next_run < now:
+                # Tarama aralıktan uzun sürdü - beklemeden devam et
+                next_run = now
+            wait_seconds = next_run - now
+            
+            print(f"\n⏰ Sonraki tarama için {wait_seconds:.1f} saniye bekleniyor...")
+            print(f"🕐 Sonraki tarama: {(datetime.now() + timedelta(seconds=wait_seconds)).strftime('%H:%M:%S')}")
             print("=" * 60)
             
-            time.sleep(3)  # 3 saniye
+            time.sleep(wait_seconds)
             
     except KeyboardInterrupt:
         print(f"\n\n🛑 Tarama durduruldu!")
@@ -454,9 +494,9 @@ def main():
     # API health check
     print(f"\n🔍 Recall API Health Check...")
     try:
-        response = requests.get(
+        response = _HTTP.get(
             f"{RECALL_API_BASE}/api/health", 
-            headers=_headers(), 
+            headers=_RECALL_HEADERS, 
             timeout=15
         )
         if response.status_code == 200:
@@ -23,6 +23,9 @@ logger = logging.getLogger(__name__)
 # Global agent instance
 agent = None
 
+# Pozisyon sayılmayan stablecoin sembolleri
+STABLECOIN_SYMBOLS = frozenset({'USDC', 'USDbC', 'USDT', 'USDT0'})
+
 def get_agent():
     """Agent instance'ını al veya oluştur"""
     global agent
@@ -68,27 +71,27 @@ def api_balances():
             
             # Chain bazında bakiyeleri hesapla
             for token in portfolio.get('tokens', []):
-                chain = token.get('specificChain', 'unknown')
-                if chain not in balances:
-                    balances[chain] = {
-                        'usdc_balance': 0,
-                        'tokens': [],
-                        'total_value': 0
-                    }
+                chain_balance = balances.setdefault(token.get('specificChain', 'unknown'), {
+                    'usdc_balance': 0,
+                    'tokens': [],
+                    'total_value': 0
+                })
+                symbol = token.get('symbol')
+                value = token.get('value', 0)
                 
                 # USDC/USDbC bakiyelerini ayır
-                if token.get('symbol') in ['USDC', 'USDbC']:
-                    balances[chain]['usdc_balance'] += token.get('value', 0)
+                if symbol in ('USDC', 'USDbC'):
+                    chain_balance['usdc_balance'] += value
                 else:
-                    balances[chain]['tokens'].append({
-                        'symbol': token.get('symbol'),
+                    chain_balance['tokens'].append({
+                        'symbol': symbol,
                         'amount': token.get('amount', 0),
                         'price': token.get('price', 0),
-                        'value': token.get('value', 0),
+                        'value': value,
                         'address': token.get('tokenAddress')
                     })
                 
-                balances[chain]['total_value'] += token.get('value', 0)
+                chain_balance['total_value'] += value
             
             return jsonify({
                 'success': True,
@@ -122,16 +125,22 @@ def api_trade_history():
             # Recall API formatını dashboard formatına çevir
             dashboard_trades = []
             for trade in trades:
+                # USDC'den çıkış alım, USDC'ye giriş satış demek - token bilgisi ilgili taraftan okunur
+                is_buy = trade.get('fromTokenSymbol') == 'USDC'
+                side = 'to' if is_buy else 'from'
+                amount = trade.get(f'{side}Amount', 0)
+                total_usd = trade.get('tradeAmountUsd', 0)
+                
                 dashboard_trade = {
-                    'type': 'buy' if trade.get('fromTokenSymbol') == 'USDC' else 'sell',
+                    'type': 'buy' if is_buy else 'sell',
                     'timestamp': trade.get('timestamp', ''),
-                    'token_address': trade.get('toToken', '') if trade.get('fromTokenSymbol') == 'USDC' else trade.get('fromToken', ''),
-                    'token_symbol': trade.get('toTokenSymbol', '') if trade.get('fromTokenSymbol') == 'USDC' else trade.get('fromTokenSymbol', ''),
-                    'chain': trade.get('toChain', '') if trade.get('fromTokenSymbol') == 'USDC' else trade.get('fromChain', ''),
-                    'specific_chain': trade.get('toSpecificChain', '') if trade.get('fromTokenSymbol') == 'USDC' else trade.get('fromSpecificChain', ''),
-                    'amount': trade.get('toAmount', 0) if trade.get('fromTokenSymbol') == 'USDC' else trade.get('fromAmount', 0),
-                    'price_usd': trade.get('tradeAmountUsd', 0) / (trade.get('toAmount', 1) if trade.get('fromTokenSymbol') == 'USDC' else trade.get('fromAmount', 1)) if (trade.get('toAmount', 0) > 0 if trade.get('fromTokenSymbol') == 'USDC' else trade.get('fromAmount', 0) > 0) else 0,
-                    'total_usd': trade.get('tradeAmountUsd', 0),
+                    'token_address': trade.get(f'{side}Token', ''),
+                    'token_symbol': trade.get(f'{side}TokenSymbol', ''),
+                    'chain': trade.get(f'{side}Chain', ''),
+                    'specific_chain': trade.get(f'{side}SpecificChain', ''),
+                    'amount': amount,
+                    'price_usd': total_usd / amount if amount > 0 else 0,
+                    'total_usd': total_usd,
                     'reason': trade.get('reason', '')
                 }
                 dashboard_trades.append(dashboard_trade)
@@ -140,8 +149,8 @@ def api_trade_history():
             dashboard_trades.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
             
             # Buy/sell sayılarını hesapla
-            buy_count = len([t for t in dashboard_trades if t.get('type') == 'buy'])
-            sell_count = len([t for t in dashboard_trades if t.get('type') == 'sell'])
+            buy_count = sum(1 for t in dashboard_trades if t['type'] == 'buy')
+            sell_count = len(dashboard_trades) - buy_count
             
             return jsonify({
                 'success': True,
@@ -182,7 +191,7 @@ def api_positions():
         
         # Her token için pozisyon oluştur (sadece değeri olanlar)
         for token in tokens:
-            if token.get('value', 0) > 0 and token.get('symbol') not in ['USDC', 'USDbC', 'USDT', 'USDT0']:
+            if token.get('value', 0) > 0 and token.get('symbol') not in STABLECOIN_SYMBOLS:
                 key = f"{token['symbol']}_{token['specificChain']}"
                 
                 positions[key] = {
@@ -238,7 +247,7 @@ def api_pnl():
         
         # Pozisyon sayısını hesapla (değeri olan tokenlar)
         tokens = portfolio.get('tokens', [])
-        positions_count = len([t for t in tokens if t.get('value', 0) > 0 and t.get('symbol') not in ['USDC', 'USDbC', 'USDT', 'USDT0']])
+        positions_count = len([t for t in tokens if t.get('value', 0) > 0 and t.get('symbol') not in STABLECOIN_SYMBOLS])
         
         return jsonify({
             'success': True,
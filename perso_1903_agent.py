@@ -8,11 +8,12 @@ import os
 import time
 import logging
 import threading
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from perso_1903_client import (
-    get_portfolio, get_price, execute_trade, 
+    get_portfolio, get_price, get_prices_bulk, execute_trade, 
     get_health, get_competition_rules
 )
 from competition_rules_manager import CompetitionRulesManager
@@ -31,6 +32,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Ağ bazında stablecoin adresleri (salt okunur, modül yüklenirken bir kez kurulur)
+STABLECOIN_ADDRESSES = MappingProxyType({
+    "ethereum": "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48",  # USDC
+    "polygon": "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174",    # USDC
+    "arbitrum": "0xaf88d065e77c8cC2239327C5EDb3A432268e5831",  # USDC
+    "optimism": "0x7F5c764cBc14f9669B88837ca1490cCa17c31607",  # USDC
+    "base": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",      # USDbC
+    "bsc": "0x8AC76a51cc950d9822D68b83fE1Ad97B32Cd580d",       # USDC
+    "avalanche": "0xB97EF9Ef8734C71904D8002F8b6Bc66Dd9c48a6E", # USDC
+    "solana": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"   # USDC
+})
+
 class ManualOrderSystem:
     """Manuel emir sistemi - Recall API odaklı"""
     
@@ -51,12 +64,13 @@ class ManualOrderSystem:
         
         # Sistem durumu raporu
         self.system_start_time = datetime.now()
+        self._start_monotonic = time.monotonic()  # Saat ayarından etkilenmeyen çalışma süresi
         logger.info(f"⏰ Sistem başlatma zamanı: {self.system_start_time.strftime('%Y-%m-%d %H:%M:%S')}")
     
     def get_system_uptime(self) -> str:
         """Sistem çalışma süresini döndür"""
-        uptime = datetime.now() - self.system_start_time
-        hours, remainder = divmod(int(uptime.total_seconds()), 3600)
+        uptime_seconds = int(time.monotonic() - self._start_monotonic)
+        hours, remainder = divmod(uptime_seconds, 3600)
         minutes, seconds = divmod(remainder, 60)
         return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
     
@@ -165,7 +179,7 @@ class ManualOrderSystem:
         
         if execution_result["success"]:
             order["status"] = "executed"
-            order["executed_at"] = datetime.now()
+            order["executed_at"] = datetime.now()  # Yarışma kaydı da aynı zamanı kullanır
             order["execution_price"] = execution_result.get("price")
             order["execution_amount"] = execution_result.get("amount")
             logger.info(f"✅ Market emir başarıyla gerçekleşti: {order_id}")
@@ -179,7 +193,7 @@ class ManualOrderSystem:
         # Yarışma kurallarına göre işlemi kaydet
         if execution_result["success"]:
             self.competition_manager.record_trade({
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": order["executed_at"].isoformat(),
                 "amount_usd": order["amount_usd"],
                 "token_symbol": order["token_symbol"],
                 "trade_type": f"market_{order['order_type']}",
@@ -210,14 +224,8 @@ class ManualOrderSystem:
             current_price = float(price_data["price"])
             
             # Trade parametreleri
-            if order["order_type"] == "buy":
-                from_token = self.get_stablecoin_address(order["specific_chain"])
-                to_token = order["token_address"]
-                amount = str(order["amount_usd"])
-            else:  # sell
-                from_token = order["token_address"]
-                to_token = self.get_stablecoin_address(order["specific_chain"])
-                amount = str(order["amount_usd"])
+            from_token, to_token = self.get_trade_tokens(order)
+            amount = str(order["amount_usd"])
             
             # Trade çalıştır
             trade_result = execute_trade(
@@ -255,45 +263,50 @@ class ManualOrderSystem:
     def check_limit_orders(self) -> None:
         """Aktif limit emirleri kontrol et"""
         
-        if not self.active_orders:
+        active_orders = self.active_orders
+        if not active_orders:
             return
         
-        logger.info(f"🔍 {len(self.active_orders)} aktif limit emir kontrol ediliyor...")
+        logger.info("🔍 %d aktif limit emir kontrol ediliyor...", len(active_orders))
+        
+        pending_orders = list(active_orders.items())
+        
+        # Bu tur için fiyat anlık görüntüsü - farklı tokenler paralel, aynı token'a bağlı emirler tek sorgu
+        price_snapshot = get_prices_bulk(
+            (order["token_address"], order["chain"], order["specific_chain"])
+            for _, order in pending_orders
+        )
         
-        for order_id, order in list(self.active_orders.items()):
+        for order_id, order in pending_orders:
             try:
                 # Güncel fiyat al
-                price_data = get_price(
-                    order["token_address"],
-                    order["chain"],
-                    order["specific_chain"]
-                )
+                price_data = price_snapshot[(order["token_address"], order["chain"], order["specific_chain"])]
                 
                 if not price_data.get("success"):
-                    logger.warning(f"⚠️ {order_id} için fiyat alınamadı")
+                    logger.warning("⚠️ %s için fiyat alınamadı", order_id)
                     continue
                 
                 current_price = float(price_data["price"])
+                limit_price = order["limit_price"]
                 
                 # Limit koşulu kontrol et
-                should_execute = False
-                
                 if order["order_type"] == "buy":
-                    should_execute = current_price <= order["limit_price"]
+                    should_execute = current_price <= limit_price
                 else:  # sell
-                    should_execute = current_price >= order["limit_price"]
+                    should_execute = current_price >= limit_price
                 
                 if should_execute:
                     logger.info(f"🎯 Limit emir koşulu sağlandı: {order_id}")
                     logger.info(f"   Güncel fiyat: ${current_price:.4f}")
-                    logger.info(f"   Limit fiyat: ${order['limit_price']:.4f}")
+                    logger.info(f"   Limit fiyat: ${limit_price:.4f}")
                     
                     # Emri çalıştır
                     execution_result = self.execute_limit_order(order, current_price)
                     
                     if execution_result["success"]:
+                        executed_at = datetime.now()
                         order["status"] = "executed"
-                        order["executed_at"] = datetime.now()
+                        order["executed_at"] = executed_at
                         order["execution_price"] = current_price
                         order["execution_amount"] = order["amount_usd"]
                         
@@ -301,7 +314,7 @@ class ManualOrderSystem:
                         
                         # Yarışma kurallarına göre işlemi kaydet
                         self.competition_manager.record_trade({
-                            "timestamp": datetime.now().isoformat(),
+                            "timestamp": executed_at.isoformat(),
                             "amount_usd": order["amount_usd"],
                             "token_symbol": order["token_symbol"],
                             "trade_type": f"limit_{order['order_type']}",
@@ -310,13 +323,14 @@ class ManualOrderSystem:
                             "chain": order["specific_chain"]
                         })
                         
-                        # Aktif emirlerden kaldır
-                        del self.active_orders[order_id]
+                        # Aktif emirlerden kaldır (bu arada iptal edilmiş olabilir)
+                        active_orders.pop(order_id, None)
                     else:
                         logger.error(f"❌ Limit emir başarısız: {order_id}")
                         logger.error(f"   Hata: {execution_result.get('error')}")
                 else:
-                    logger.debug(f"⏳ {order_id} bekliyor - Fiyat: ${current_price:.4f}, Limit: ${order['limit_price']:.4f}")
+                    # Her turda her bekleyen emir için çağrılır - DEBUG kapalıyken biçimlendirme yapılmasın
+                    logger.debug("⏳ %s bekliyor - Fiyat: $%.4f, Limit: $%.4f", order_id, current_price, limit_price)
                     
             except Exception as e:
                 logger.error(f"❌ {order_id} kontrol hatası: {e}")
@@ -326,14 +340,8 @@ class ManualOrderSystem:
         
         try:
             # Trade parametreleri
-            if order["order_type"] == "buy":
-                from_token = self.get_stablecoin_address(order["specific_chain"])
-                to_token = order["token_address"]
-                amount = str(order["amount_usd"])
-            else:  # sell
-                from_token = order["token_address"]
-                to_token = self.get_stablecoin_address(order["specific_chain"])
-                amount = str(order["amount_usd"])
+            from_token, to_token = self.get_trade_tokens(order)
+            amount = str(order["amount_usd"])
             
             # Trade çalıştır
             trade_result = execute_trade(
@@ -368,44 +376,39 @@ class ManualOrderSystem:
                 "error": f"Limit emir hatası: {str(e)}"
             }
     
+    def get_trade_tokens(self, order: Dict[str, Any]) -> Tuple[str, str]:
+        """Emir yönüne göre (from_token, to_token) çiftini döndür"""
+        stablecoin = self.get_stablecoin_address(order["specific_chain"])
+        if order["order_type"] == "buy":
+            return stablecoin, order["token_address"]
+        return order["token_address"], stablecoin  # sell
+    
     def get_stablecoin_address(self, specific_chain: str) -> str:
         """Ağa göre stablecoin adresi döndür"""
         
-        stablecoin_addresses = {
-            "ethereum": "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48",  # USDC
-            "polygon": "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174",    # USDC
-            "arbitrum": "0xaf88d065e77c8cC2239327C5EDb3A432268e5831",  # USDC
-            "optimism": "0x7F5c764cBc14f9669B88837ca1490cCa17c31607",  # USDC
-            "base": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",      # USDbC
-            "bsc": "0x8AC76a51cc950d9822D68b83fE1Ad97B32Cd580d",       # USDC
-            "avalanche": "0xB97EF9Ef8734C71904D8002F8b6Bc66Dd9c48a6E", # USDC
-            "solana": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"   # USDC
-        }
-        
-        return stablecoin_addresses.get(specific_chain.lower(), stablecoin_addresses["ethereum"])
+        return STABLECOIN_ADDRESSES.get(specific_chain.lower(), STABLECOIN_ADDRESSES["ethereum"])
     
     def cancel_order(self, order_id: str) -> bool:
         """Emri iptal et"""
         
-        if order_id in self.active_orders:
-            order = self.active_orders[order_id]
-            order["status"] = "cancelled"
-            order["executed_at"] = datetime.now()
-            
-            del self.active_orders[order_id]
-            
-            logger.info(f"❌ Emir iptal edildi: {order_id}")
-            return True
-        else:
+        order = self.active_orders.pop(order_id, None)
+        if order is None:
             logger.warning(f"⚠️ Emir bulunamadı: {order_id}")
             return False
+        
+        order["status"] = "cancelled"
+        order["executed_at"] = datetime.now()
+        
+        logger.info(f"❌ Emir iptal edildi: {order_id}")
+        return True
     
     def get_order_status(self, order_id: str) -> Optional[Dict[str, Any]]:
         """Emir durumu sorgula"""
         
         # Aktif emirlerde ara
-        if order_id in self.active_orders:
-            return self.active_orders[order_id]
+        order = self.active_orders.get(order_id)
+        if order is not None:
+            return order
         
         # Geçmişte ara
         for order in self.order_history:
@@ -440,16 +443,27 @@ class ManualOrderSystem:
         
         logger.info(f"🔄 Emir monitörü başlatıldı (her {interval_minutes} dakikada)")
         
+        interval_seconds = interval_minutes * 60
+        next_run = time.monotonic()
+        
         while True:
             try:
                 self.check_limit_orders()
-                time.sleep(interval_minutes * 60)
+                
+                # Sonraki kontrolü mutlak zamana göre planla (kontrol süresi kaymaya yol açmasın)
+                next_run += interval_seconds
+                now = time.monotonic()
+                if next_run < now:
+                    # Kontrol aralıktan uzun sürdü - beklemeden devam et
+                    next_run = now
+                time.sleep(next_run - now)
             except KeyboardInterrupt:
                 logger.info("🛑 Emir monitörü durduruldu")
                 break
             except Exception as e:
                 logger.error(f"❌ Monitör hatası: {e}")
                 time.sleep(30)  # Hata durumunda 30 saniye bekle
+                next_run = time.monotonic()
 
 
 class Perso1903Agent:
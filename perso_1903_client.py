@@ -5,14 +5,23 @@ Clean implementation based on Recall Network API documentation
 """
 
 import os
+import time
 import requests
-import json
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import math
+import logging
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # ===== CLIENT: match agent env resolution =====
 RECALL_ENV = os.getenv("RECALL_ENV", "production").strip().lower()
 IS_PROD = RECALL_ENV == "production"
@@ -35,61 +44,141 @@ if not RECALL_API_KEY:
 if not RECALL_API_KEY:
     raise RuntimeError(f"Client missing Recall API config for {RECALL_ENV}")
 
-def _headers():
-    """Generate headers for API requests"""
-    return {
-        "Authorization": f"Bearer {RECALL_API_KEY}",
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "User-Agent": "Perso-1903/client (prod-first)"
-    }
+# Endpoint URLs - RECALL_API_BASE is fixed after import
+_URL_BALANCES = f"{RECALL_API_BASE}/api/agent/balances"
+_URL_PROFILE = f"{RECALL_API_BASE}/api/agent/profile"
+_URL_PRICE = f"{RECALL_API_BASE}/api/price"
+_URL_TRADE = f"{RECALL_API_BASE}/api/trade/execute"
+_URL_HEALTH = f"{RECALL_API_BASE}/api/health"
+_URL_COMPETITION_RULES = f"{RECALL_API_BASE}/api/competitions/rules"
+_URL_COMPETITION_STATUS = f"{RECALL_API_BASE}/api/competitions/status"
+_URL_COMPETITION_LEADERBOARD = f"{RECALL_API_BASE}/api/competitions/leaderboard"
+_URL_COMPETITIONS = f"{RECALL_API_BASE}/api/competitions"
+_URL_TRADE_HISTORY = f"{RECALL_API_BASE}/api/agent/trades"
+_URL_TRANSACTIONS = f"{RECALL_API_BASE}/api/agent/transactions"
+
+# Shared HTTP session: keep-alive + connection pool for all Recall API calls.
+# Only idempotent methods are retried; trade POSTs are never replayed.
+_HTTP = requests.Session()
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    pool_block=False,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+)
+_HTTP.mount("https://", _HTTP_ADAPTER)
+_HTTP.mount("http://", _HTTP_ADAPTER)
+
+# In-process TTL cache for idempotent GETs. Only successful responses are
+# cached; rules/status may fall back to the last good value for a while
+# after expiry if the API is unreachable. TTLs are in seconds.
+HEALTH_CACHE_TTL = 10.0
+PRICE_CACHE_TTL = 5.0
+PORTFOLIO_CACHE_TTL = 5.0
+LEADERBOARD_CACHE_TTL = 30.0
+STATUS_CACHE_TTL = 60.0
+RULES_CACHE_TTL = 3600.0
+RULES_STALE_TTL = 300.0
+STATUS_STALE_TTL = 120.0
+_TTL_CACHE_MAX_ENTRIES = 512
+
+# The monitor polls from a background thread while the agent/dashboard call in
+# from request/main threads
+_TTL_CACHE_LOCK = threading.Lock()
+
+def _ttl_cache(seconds: float, stale_seconds: float = 0.0):
+    """Cache an API getter's successful result per call arguments for `seconds`.
+    
+    On a failed refresh the previous result is returned (marked "stale")
+    for up to `stale_seconds` after it expired.
+    """
+    def decorator(func):
+        entries = {}  # args -> (ts, data)
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with _TTL_CACHE_LOCK:
+                cached = entries.get(key)
+            if cached is not None and now - cached[0] < seconds:
+                return cached[1]
+            
+            result = func(*args, **kwargs)
+            if result.get("success"):
+                with _TTL_CACHE_LOCK:
+                    if len(entries) >= _TTL_CACHE_MAX_ENTRIES:
+                        entries.clear()
+                    entries[key] = (now, result)
+                return result
+            
+            if cached is not None and now - cached[0] < seconds + stale_seconds:
+                logger.warning(f"⚠️ {func.__name__} failed, serving cached value")
+                return {**cached[1], "stale": True}
+            return result
+        
+        def cache_clear() -> None:
+            with _TTL_CACHE_LOCK:
+                entries.clear()
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+# Headers for API requests - constant for the process, set once on the session
+_HEADERS = {
+    "Authorization": f"Bearer {RECALL_API_KEY}",
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+    "User-Agent": "Perso-1903/client (prod-first)"
+}
+_HTTP.headers.update(_HEADERS)
 
 def get_balances() -> Dict[str, Any]:
     """Get agent balances"""
     try:
-        response = requests.get(
-            f"{RECALL_API_BASE}/api/agent/balances", 
-            headers=_headers(), 
+        response = _HTTP.get(
+            _URL_BALANCES,
             timeout=30
         )
         response.raise_for_status()
         return response.json()
     except Exception as e:
-        print(f"❌ Error fetching balances: {e}")
+        logger.error(f"❌ Error fetching balances: {e}")
         return {"success": False, "error": str(e)}
 
+@_ttl_cache(PORTFOLIO_CACHE_TTL)
 def get_portfolio() -> Dict[str, Any]:
     """Get agent portfolio (using balances endpoint) - RECALL API ONLY"""
     try:
-        response = requests.get(
-            f"{RECALL_API_BASE}/api/agent/balances", 
-            headers=_headers(), 
+        response = _HTTP.get(
+            _URL_BALANCES,
             timeout=120
         )
         response.raise_for_status()
         data = response.json()
         
         if data.get("success"):
-            balances = data.get("balances", [])
-            total_value = 0
-            tokens = []
-            
-            for balance in balances:
-                # Use actual value from API
-                value = balance.get("value", 0)
-                price = balance.get("price", 0)
-                
-                token_data = {
+            # Use actual value/price from API
+            tokens = [
+                {
                     "tokenAddress": balance.get("tokenAddress"),
                     "symbol": balance.get("symbol"),
                     "chain": balance.get("chain"),
                     "specificChain": balance.get("specificChain"),
                     "amount": balance.get("amount", 0),
-                    "value": value,
-                    "price": price
+                    "value": balance.get("value", 0),
+                    "price": balance.get("price", 0)
                 }
-                tokens.append(token_data)
-                total_value += value
+                for balance in data.get("balances", [])
+            ]
+            total_value = math.fsum(token["value"] for token in tokens)
             
             return {
                 "success": True,
@@ -100,23 +189,23 @@ def get_portfolio() -> Dict[str, Any]:
             }
         return data
     except Exception as e:
-        print(f"❌ Error fetching portfolio: {e}")
+        logger.error(f"❌ Error fetching portfolio: {e}")
         return {"success": False, "error": str(e)}
 
 def get_profile() -> Dict[str, Any]:
     """Get agent profile"""
     try:
-        response = requests.get(
-            f"{RECALL_API_BASE}/api/agent/profile", 
-            headers=_headers(), 
+        response = _HTTP.get(
+            _URL_PROFILE,
             timeout=15
         )
         response.raise_for_status()
         return response.json()
     except Exception as e:
-        print(f"❌ Error fetching profile: {e}")
+        logger.error(f"❌ Error fetching profile: {e}")
         return {"success": False, "error": str(e)}
 
+@_ttl_cache(PRICE_CACHE_TTL)
 def get_price(token_address: str, chain: str = "evm", specific_chain: str = "eth") -> Dict[str, Any]:
     """Get token price"""
     try:
@@ -125,18 +214,28 @@ def get_price(token_address: str, chain: str = "evm", specific_chain: str = "eth
             "chain": chain,
             "specificChain": specific_chain
         }
-        response = requests.get(
-            f"{RECALL_API_BASE}/api/price", 
+        response = _HTTP.get(
+            _URL_PRICE,
             params=params,
-            headers=_headers(), 
             timeout=15
         )
         response.raise_for_status()
         return response.json()
     except Exception as e:
-        print(f"❌ Error fetching price: {e}")
+        logger.error(f"❌ Error fetching price: {e}")
         return {"success": False, "error": str(e)}
 
+PRICE_FETCH_WORKERS = 8
+
+def get_prices_bulk(tokens: Iterable[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+    """Get prices for several (token_address, chain, specific_chain) keys concurrently"""
+    keys = list(dict.fromkeys(tokens))
+    if not keys:
+        return {}
+    
+    with ThreadPoolExecutor(max_workers=min(PRICE_FETCH_WORKERS, len(keys))) as executor:
+        return dict(zip(keys, executor.map(lambda key: get_price(*key), keys)))
+
 def execute_trade(from_token: str, to_token: str, amount: str, 
                  from_chain: str = "evm", to_chain: str = "evm",
                  from_specific_chain: str = "eth", to_specific_chain: str = "eth",
@@ -154,34 +253,34 @@ def execute_trade(from_token: str, to_token: str, amount: str,
             "reason": reason
         }
         
-        print(f"🔍 DEBUG - Trade Payload:")
-        print(json.dumps(payload, indent=2))
+        logger.debug("🔍 Trade payload: %s", payload)
         
-        response = requests.post(
-            f"{RECALL_API_BASE}/api/trade/execute", 
+        response = _HTTP.post(
+            _URL_TRADE,
             json=payload,
-            headers=_headers(),
             timeout=30
         )
         
-        print(f"🔍 DEBUG - Response Status: {response.status_code}")
-        print(f"🔍 DEBUG - Response Headers: {dict(response.headers)}")
+        logger.debug("🔍 Trade response status: %d, headers: %s", response.status_code, response.headers)
         
         if response.status_code != 200:
-            print(f"🔍 DEBUG - Response Text: {response.text}")
+            # Failure body is what explains a rejected trade - keep it visible
+            logger.warning("🔍 Trade response %d: %s", response.status_code, response.text[:500])
         
         response.raise_for_status()
+        # Balances changed - don't serve a stale portfolio
+        get_portfolio.cache_clear()
         return response.json()
     except Exception as e:
-        print(f"❌ Error executing trade: {e}")
+        logger.error(f"❌ Error executing trade: {e}")
         return {"success": False, "error": str(e)}
 
+@_ttl_cache(HEALTH_CACHE_TTL)
 def get_health() -> Dict[str, Any]:
     """Get API health status"""
     try:
-        response = requests.get(
-            f"{RECALL_API_BASE}/api/health", 
-            headers=_headers(), 
+        response = _HTTP.get(
+            _URL_HEALTH,
             timeout=15
         )
         response.raise_for_status()
@@ -189,95 +288,92 @@ def get_health() -> Dict[str, Any]:
         # API returns {"status": "ok"} not {"success": true}
         return {"success": data.get("status") == "ok", "data": data}
     except Exception as e:
-        print(f"❌ Error fetching health: {e}")
+        logger.error(f"❌ Error fetching health: {e}")
         return {"success": False, "error": str(e)}
 
+@_ttl_cache(RULES_CACHE_TTL, RULES_STALE_TTL)
 def get_competition_rules() -> Dict[str, Any]:
     """Get competition rules"""
     try:
-        response = requests.get(
-            f"{RECALL_API_BASE}/api/competitions/rules", 
-            headers=_headers(), 
+        response = _HTTP.get(
+            _URL_COMPETITION_RULES,
             timeout=15
         )
         response.raise_for_status()
         return response.json()
     except Exception as e:
-        print(f"❌ Error fetching competition rules: {e}")
+        logger.error(f"❌ Error fetching competition rules: {e}")
         return {"success": False, "error": str(e)}
 
+@_ttl_cache(STATUS_CACHE_TTL, STATUS_STALE_TTL)
 def get_competition_status() -> Dict[str, Any]:
     """Get competition status"""
     try:
-        response = requests.get(
-            f"{RECALL_API_BASE}/api/competitions/status", 
-            headers=_headers(), 
+        response = _HTTP.get(
+            _URL_COMPETITION_STATUS,
             timeout=15
         )
         response.raise_for_status()
         return response.json()
     except Exception as e:
-        print(f"❌ Error fetching competition status: {e}")
+        logger.error(f"❌ Error fetching competition status: {e}")
         return {"success": False, "error": str(e)}
 
+@_ttl_cache(LEADERBOARD_CACHE_TTL)
 def get_competition_leaderboard() -> Dict[str, Any]:
     """Get competition leaderboard"""
     try:
-        response = requests.get(
-            f"{RECALL_API_BASE}/api/competitions/leaderboard", 
-            headers=_headers(), 
+        response = _HTTP.get(
+            _URL_COMPETITION_LEADERBOARD,
             timeout=15
         )
         response.raise_for_status()
         return response.json()
     except Exception as e:
-        print(f"❌ Error fetching competition leaderboard: {e}")
+        logger.error(f"❌ Error fetching competition leaderboard: {e}")
         return {"success": False, "error": str(e)}
 
 def get_competitions() -> Dict[str, Any]:
     """Get all competitions"""
     try:
-        response = requests.get(
-            f"{RECALL_API_BASE}/api/competitions", 
-            headers=_headers(), 
+        response = _HTTP.get(
+            _URL_COMPETITIONS,
             timeout=15
         )
         response.raise_for_status()
         return response.json()
     except Exception as e:
-        print(f"❌ Error fetching competitions: {e}")
+        logger.error(f"❌ Error fetching competitions: {e}")
         return {"success": False, "error": str(e)}
 
 def get_trade_history(limit: int = 50) -> Dict[str, Any]:
     """Get agent trade history from Recall API"""
     try:
         params = {"limit": limit} if limit else {}
-        response = requests.get(
-            f"{RECALL_API_BASE}/api/agent/trades", 
+        response = _HTTP.get(
+            _URL_TRADE_HISTORY,
             params=params,
-            headers=_headers(), 
             timeout=60
         )
         response.raise_for_status()
         return response.json()
     except Exception as e:
-        print(f"❌ Error fetching trade history: {e}")
+        logger.error(f"❌ Error fetching trade history: {e}")
         return {"success": False, "error": str(e)}
 
 def get_agent_transactions(limit: int = 50) -> Dict[str, Any]:
     """Get agent transactions from Recall API"""
     try:
         params = {"limit": limit} if limit else {}
-        response = requests.get(
-            f"{RECALL_API_BASE}/api/agent/transactions", 
+        response = _HTTP.get(
+            _URL_TRANSACTIONS,
             params=params,
-            headers=_headers(), 
             timeout=30
         )
         response.raise_for_status()
         return response.json()
     except Exception as e:
-        print(f"❌ Error fetching transactions: {e}")
+        logger.error(f"❌ Error fetching transactions: {e}")
         return {"success": False, "error": str(e)}
 
 # ===== MAIN EXECUTION =====
@@ -296,9 +392,17 @@ def main():
         print("❌ API Health: FAILED")
         return
     
+    # Remaining probes are independent - run them concurrently, report in order
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        portfolio_future = executor.submit(get_portfolio)
+        balances_future = executor.submit(get_balances)
+        rules_future = executor.submit(get_competition_rules)
+        status_future = executor.submit(get_competition_status)
+        leaderboard_future = executor.submit(get_competition_leaderboard)
+    
     # Test portfolio
     print("\n📊 Testing Portfolio...")
-    portfolio = get_portfolio()
+    portfolio = portfolio_future.result()
     if portfolio.get("success"):
         total_value = portfolio.get("totalValue", 0)
         tokens = portfolio.get("tokens", [])
@@ -309,7 +413,7 @@ def main():
     
     # Test balances
     print("\n💰 Testing Balances...")
-    balances = get_balances()
+    balances = balances_future.result()
     if balances.get("success"):
         print("✅ Balances fetched successfully")
     else:
@@ -317,7 +421,7 @@ def main():
     
     # Test competition rules
     print("\n📋 Testing Competition Rules...")
-    rules = get_competition_rules()
+    rules = rules_future.result()
     if rules.get("success"):
         print("✅ Competition rules fetched successfully")
     else:
@@ -325,7 +429,7 @@ def main():
     
     # Test competition status
     print("\n🏆 Testing Competition Status...")
-    status = get_competition_status()
+    status = status_future.result()
     if status.get("success"):
         active = status.get("active", False)
         print(f"✅ Competition status: {'Active' if active else 'Inactive'}")
@@ -334,7 +438,7 @@ def main():
     
     # Test leaderboard
     print("\n🏅 Testing Leaderboard...")
-    leaderboard = get_competition_leaderboard()
+    leaderboard = leaderboard_future.result()
     if leaderboard.get("success"):
         leaderboard_data = leaderboard.get("leaderboard", [])
         print(f"✅ Leaderboard fetched: {len(leaderboard_data)} agents")
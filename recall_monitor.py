@@ -4,24 +4,52 @@ Perso-1903 Agent - Recall API Sürekli İzleme Sistemi
 """
 
 import time
+import heapq
+import random
 import threading
 import logging
+import logging.handlers
+import queue
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List
-from perso_1903_client import get_portfolio, get_balances, get_health, get_price
+from typing import Dict, Any
+from perso_1903_client import get_portfolio, get_health
 from perso_1903_agent import Perso1903Agent
 
-# Logging ayarla
+# Logging ayarla - kayıtlar kuyruğa atılır, dosya/konsol yazımı arka plan thread'inde yapılır
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.FileHandler('logs/agent.jsonl', encoding='utf-8'),
+    logging.StreamHandler(),
+    respect_handler_level=True
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Çıkışta kuyrukta kalan kayıtları yaz
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/agent.jsonl', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
+    force=True  # İçe aktarılan modüllerin kurduğu handler'ların yerine geç
 )
 logger = logging.getLogger(__name__)
 
+# Başarısız turlar arasında beklenecek en uzun süre (saniye)
+MAX_RETRY_DELAY = 60
+
+# Saniye çözünürlüklü ISO zaman damgası önbelleği: [epoch saniye, metin]
+_now_iso_cache = [0, ""]
+
+def _now_iso() -> str:
+    """Yerel saati saniye hassasiyetinde ISO formatında döndür (aynı saniye içinde önbellekten)"""
+    now = int(time.time())
+    if now != _now_iso_cache[0]:
+        _now_iso_cache[1] = datetime.fromtimestamp(now).isoformat(timespec='seconds')
+        _now_iso_cache[0] = now
+    return _now_iso_cache[1]
+
 class RecallAPIMonitor:
     """Recall API sürekli izleme sistemi"""
     
@@ -31,6 +59,7 @@ class RecallAPIMonitor:
         self.last_portfolio_value = 0
         self.last_token_count = 0
         self.monitoring_thread = None
+        self._stop_event = threading.Event()  # stop_monitoring bekleyen döngüyü anında uyandırır
         
         logger.info("Recall API Monitor baslatildi")
     
@@ -86,55 +115,93 @@ class RecallAPIMonitor:
         # En büyük pozisyonları logla
         tokens = current_portfolio.get('tokens', [])
         if tokens:
-            sorted_tokens = sorted(tokens, key=lambda x: float(x.get('value', 0)), reverse=True)
-            top_3 = sorted_tokens[:3]
+            # Tam sıralama yerine sadece ilk 3'ü seç
+            top_3 = heapq.nlargest(3, tokens, key=lambda x: float(x.get('value', 0)))
+            pct_factor = 100 / current_value if current_value > 0 else 0
             
             logger.info("En buyuk 3 pozisyon:")
             for i, token in enumerate(top_3, 1):
                 symbol = token.get('symbol', 'N/A')
                 chain = token.get('specificChain', 'N/A')
                 value = float(token.get('value', 0))
-                pct = (value / current_value * 100) if current_value > 0 else 0
+                pct = value * pct_factor
                 logger.info(f"  {i}. {symbol} ({chain}): ${value:,.2f} ({pct:.1f}%)")
         
         # Güncelle
         self.last_portfolio_value = current_value
         self.last_token_count = current_token_count
     
+    @staticmethod
+    def _retry_delay(failures: int) -> float:
+        """Art arda hata sayısına göre üstel bekleme + jitter süresi (saniye)"""
+        # Üs sınırlanır: uzun kesintide 2 ** failures taşmasın
+        return min(MAX_RETRY_DELAY, 2 ** min(failures, 6) + random.random())
+    
     def monitor_portfolio(self):
         """Portföyü sürekli izle"""
         logger.info("Portfolio izleme baslatildi")
         
+        check_interval = 60
+        status_log_interval = 600
+        failures = 0  # Art arda başarısız tur sayısı (üstel bekleme için)
+        next_run = time.monotonic()
+        last_status_log = time.monotonic()
+        
+        # Döngüde tekrar tekrar çözülen metodları yerel isimlere bağla
+        check_api_health = self.check_api_health
+        get_portfolio_data = self.get_portfolio_data
+        analyze_portfolio_changes = self.analyze_portfolio_changes
+        wait = self._stop_event.wait
+        monotonic = time.monotonic
+        
         while self.running:
             try:
                 # API sağlık kontrolü
-                if not self.check_api_health():
-                    logger.warning("API saglik sorunu - 30 saniye bekleniyor")
-                    time.sleep(30)
+                if not check_api_health():
+                    # Üstel bekleme + jitter: kısa kesintide hızlı toparlan, uzun kesintide API'yi yorma
+                    retry_delay = self._retry_delay(failures)
+                    failures += 1
+                    logger.warning(f"API saglik sorunu - {retry_delay:.1f} saniye bekleniyor")
+                    if wait(retry_delay):
+                        break
+                    next_run = monotonic()
                     continue
+                failures = 0
                 
                 # Portföy verilerini çek
-                portfolio = self.get_portfolio_data()
+                portfolio = get_portfolio_data()
                 
                 if portfolio.get('success'):
                     # Değişiklikleri analiz et
-                    self.analyze_portfolio_changes(portfolio)
+                    analyze_portfolio_changes(portfolio)
                     
                     # Genel durum logla (her 10 dakikada bir)
-                    if int(time.time()) % 600 == 0:  # Her 10 dakikada
+                    now = monotonic()
+                    if now - last_status_log >= status_log_interval:
+                        last_status_log = now
                         total_value = portfolio.get('totalValue', 0)
                         token_count = len(portfolio.get('tokens', []))
                         logger.info(f"Portfolio durumu: ${total_value:,.2f}, {token_count} token")
                 
-                # 60 saniye bekle
-                time.sleep(60)
+                # Sonraki kontrolü mutlak zamana göre planla (kontrol süresi kaymaya yol açmasın)
+                next_run += check_interval
+                now = monotonic()
+                if next_run < now:
+                    next_run = now
+                if wait(next_run - now):
+                    break
                 
             except KeyboardInterrupt:
                 logger.info("Portfolio izleme durduruldu")
                 break
             except Exception as e:
                 logger.error(f"Portfolio izleme hatasi: {e}")
-                time.sleep(30)  # Hata durumunda 30 saniye bekle
+                # Hata durumunda üstel bekleme + jitter
+                retry_delay = self._retry_delay(failures)
+                failures += 1
+                if wait(retry_delay):
+                    break
+                next_run = monotonic()
     
     def start_monitoring(self):
         """İzlemeyi başlat"""
@@ -143,6 +210,7 @@ class RecallAPIMonitor:
             return
         
         self.running = True
+        self._stop_event.clear()
         self.monitoring_thread = threading.Thread(target=self.monitor_portfolio, daemon=True)
         self.monitoring_thread.start()
         
@@ -152,20 +220,25 @@ class RecallAPIMonitor:
     def stop_monitoring(self):
         """İzlemeyi durdur"""
         self.running = False
+        self._stop_event.set()
         if self.monitoring_thread:
             self.monitoring_thread.join(timeout=5)
         logger.info("Recall API izleme sistemi durduruldu")
     
     def get_current_status(self) -> Dict[str, Any]:
         """Mevcut durumu al"""
-        portfolio = self.get_portfolio_data()
-        health = get_health()
+        # Portföy ve sağlık sorguları bağımsız - paralel çalıştır
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            portfolio_future = executor.submit(self.get_portfolio_data)
+            health_future = executor.submit(get_health)
+            portfolio = portfolio_future.result()
+            health = health_future.result()
         
         return {
             "api_health": health.get('success', False),
             "portfolio": portfolio,
             "monitoring_active": self.running,
-            "last_check": datetime.now().isoformat()
+            "last_check": _now_iso()
         }
 
 def main():